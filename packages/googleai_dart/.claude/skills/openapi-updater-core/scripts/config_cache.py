@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Shared JSON/text helpers and memoized config loading for the scripts.
+
+The scripts read the same config files (package.json, documentation.json,
+...). Loads are cached per (path, mtime, size), so when the scripts run in
+one process (see verify_all.py) every file is parsed once.
+
+Cached values are shared between callers and must not be mutated.
+"""
+
+import bisect
+import functools
+import json
+import re
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional accelerator; fall back to the stdlib
+    orjson = None
+
+NEWLINE_RE = re.compile(r'\n')
+NEWLINE_BYTES_RE = re.compile(rb'\n')
+
+
+def loads_json(data: bytes):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj) -> bytes:
+    """Serialize to 2-space indented JSON bytes, byte-identical to json.dumps."""
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+@functools.lru_cache(maxsize=None)
+def _load(path: Path, mtime_ns: int, size: int):
+    """Parse a JSON file; the stat signature is part of the cache key."""
+    return loads_json(path.read_bytes())
+
+
+def load_json(path: Path):
+    """Load a JSON file, reusing the parsed result while it is unchanged."""
+    stat = path.stat()
+    return _load(path.resolve(), stat.st_mtime_ns, stat.st_size)
+
+
+def newline_offsets(text: str | bytes) -> list[int]:
+    """Offsets of every newline in text, for mapping positions to lines."""
+    pattern = NEWLINE_RE if isinstance(text, str) else NEWLINE_BYTES_RE
+    return [m.start() for m in pattern.finditer(text)]
+
+
+def line_number(offsets: list[int], pos: int) -> int:
+    """1-based line number of position pos, given newline_offsets()."""
+    return bisect.bisect_left(offsets, pos) + 1
@@ -5,12 +5,18 @@ Fetch the latest OpenAPI specifications.
 This is a config-driven script that loads spec URLs from config files.
 
 Usage:
-    python3 fetch_spec.py --config-dir CONFIG_DIR [--spec NAME] [--no-discover]
+    python3 fetch_spec.py --config-dir CONFIG_DIR [--spec NAME] [--no-discover] [--stats-only]
+                          [--jobs N] [--refresh-discovery]
 
 Examples:
     python3 fetch_spec.py --config-dir config/      # Fetch all specs + discover new
     python3 fetch_spec.py --config-dir config/ --spec main   # Fetch only main spec
     python3 fetch_spec.py --config-dir config/ --no-discover # Skip discovery probing
+    python3 fetch_spec.py --config-dir config/ --stats-only  # Save raw bytes, skip ETag cache
+    python3 fetch_spec.py --config-dir config/ --jobs 1      # One request at a time
+
+Discovery remembers URLs that returned 404 for 24 hours and skips them;
+use --refresh-discovery to probe every candidate again.
 
 Exit codes:
     0 - Success
@@ -19,13 +25,185 @@ Exit codes:
 """
 
 import argparse
+import base64
+import http.client
 import json
 import os
+import re
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from urllib.request import urlopen, Request
-from urllib.error import URLError, HTTPError
+from typing import NamedTuple
+from urllib.parse import unquote, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+from config_cache import dumps_json, load_json, loads_json
+
+USER_AGENT = 'OpenAPI-Updater/1.0'
+
+# Upper bound on concurrent spec downloads (the workload is network-bound)
+MAX_WORKERS = 8
+
+# Upper bound on concurrent discovery probes
+DISCOVERY_WORKERS = 20
+
+# Discovery candidates that returned 404, with the time they were probed
+DISCOVERY_CACHE_FILE = Path(tempfile.gettempdir()) / 'openapi-discover-negative.json'
+DISCOVERY_NEGATIVE_TTL = 24 * 60 * 60
+
+MAX_REDIRECTS = 5
+
+# Every OpenAPI 3 document has a top-level "openapi" key
+OPENAPI_KEY_RE = re.compile(rb'"openapi"\s*:')
+
+# Operation keys counted as endpoints in a path item
+HTTP_METHODS = frozenset({'get', 'post', 'put', 'patch', 'delete'})
+
+
+class Response(NamedTuple):
+    """A fully-read HTTP response."""
+    status: int
+    reason: str
+    headers: http.client.HTTPMessage
+    body: bytes
+
+
+class FetchResult(NamedTuple):
+    """A fetched spec, its raw bytes, and the cache validators the server sent."""
+    spec: dict
+    validators: dict[str, str]
+    not_modified: bool = False
+    body: bytes = b''
+
+
+class ConnectionPool:
+    """Idle keep-alive HTTP(S) connections shared by all threads, one user at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._proxies = getproxies()
+
+    def _proxy_for(self, scheme: str, netloc: str) -> str | None:
+        """Proxy URL from the environment for this host, or None for a direct connection."""
+        proxy = self._proxies.get(scheme)
+        if not proxy or proxy_bypass(urlsplit(f"//{netloc}").hostname or netloc):
+            return None
+        return proxy if '://' in proxy else f"http://{proxy}"
+
+    def _connect(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        proxy = self._proxy_for(scheme, netloc)
+        if proxy is None:
+            if scheme == 'https':
+                return http.client.HTTPSConnection(netloc)
+            return http.client.HTTPConnection(netloc)
+
+        proxy_parts = urlsplit(proxy)
+        proxy_host = proxy_parts.hostname
+        if proxy_parts.port:
+            proxy_host = f"{proxy_host}:{proxy_parts.port}"
+        proxy_headers = {}
+        if proxy_parts.username:
+            credentials = f"{unquote(proxy_parts.username)}:{unquote(proxy_parts.password or '')}"
+            proxy_headers['Proxy-Authorization'] = (
+                'Basic ' + base64.b64encode(credentials.encode()).decode('ascii')
+            )
+        if scheme == 'https':
+            # CONNECT tunnel through the proxy, then TLS to the target host
+            conn = http.client.HTTPSConnection(proxy_host)
+            conn.set_tunnel(netloc, headers=proxy_headers)
+        else:
+            conn = http.client.HTTPConnection(proxy_host)
+            conn.proxy_headers = proxy_headers
+        conn.via_proxy = True
+        return conn
+
+    def _checkout(self, scheme: str, netloc: str, fresh: bool = False) -> tuple[http.client.HTTPConnection, bool]:
+        """Take an idle connection for the host (or open one); returns (conn, reused)."""
+        if not fresh:
+            with self._lock:
+                idle = self._idle.get((scheme, netloc))
+                if idle:
+                    return idle.pop(), True
+        return self._connect(scheme, netloc), False
+
+    def _checkin(self, scheme: str, netloc: str, conn: http.client.HTTPConnection):
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(conn)
+
+    def _send(self, method: str, scheme: str, netloc: str, path: str,
+              headers: dict[str, str], timeout: float) -> tuple[http.client.HTTPResponse, bytes]:
+        """Send one request, reconnecting once if a kept-alive connection went stale."""
+        for attempt in range(2):
+            conn, reused = self._checkout(scheme, netloc, fresh=attempt > 0)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+
+            target = path
+            request_headers = headers
+            if getattr(conn, 'via_proxy', False) and scheme == 'http':
+                # Plain HTTP proxies expect the absolute URL
+                target = f"http://{netloc}{path}"
+                request_headers = {**headers, **conn.proxy_headers}
+
+            try:
+                conn.request(method, target, headers=request_headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (ConnectionResetError, BrokenPipeError):
+                # The server may have closed an idle keep-alive connection
+                # (RemoteDisconnected is a ConnectionResetError); only GET and
+                # HEAD are sent, so retrying on a fresh connection is safe.
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                raise
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(scheme, netloc, conn)
+            return resp, body
+
+    def request(self, method: str, url: str, headers: dict[str, str] | None = None,
+                timeout: float = 30) -> Response:
+        """Send a request, following redirects, and read the whole body."""
+        headers = {'User-Agent': USER_AGENT, 'Connection': 'keep-alive', **(headers or {})}
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            path = parts.path or '/'
+            if parts.query:
+                path = f"{path}?{parts.query}"
+
+            resp, body = self._send(method, parts.scheme, parts.netloc, path, headers, timeout)
+
+            location = resp.getheader('Location')
+            if resp.status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+
+            return Response(resp.status, resp.reason, resp.headers, body)
+
+        raise http.client.HTTPException(f"Too many redirects for {url.split('?')[0]}")
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+
+POOL = ConnectionPool()
 
 
 def load_config(config_dir: Path) -> dict:
@@ -41,12 +219,11 @@ def load_config(config_dir: Path) -> dict:
     # Load specs.json
     specs_file = config_dir / 'specs.json'
     if specs_file.exists():
-        with open(specs_file) as f:
-            specs = json.load(f)
-            config['specs'] = specs.get('specs', {})
-            config['output_dir'] = specs.get('output_dir', config['output_dir'])
-            config['discovery_patterns'] = specs.get('discovery_patterns', [])
-            config['discovery_names'] = specs.get('discovery_names', [])
+        specs = load_json(specs_file)
+        config['specs'] = specs.get('specs', {})
+        config['output_dir'] = specs.get('output_dir', config['output_dir'])
+        config['discovery_patterns'] = specs.get('discovery_patterns', [])
+        config['discovery_names'] = specs.get('discovery_names', [])
 
     return config
 
@@ -69,40 +246,79 @@ def get_api_key(config: dict) -> str | None:
     return None
 
 
-def fetch_url(url: str, api_key: str | None = None, requires_auth: bool = False) -> dict | None:
-    """Fetch JSON from URL with optional auth."""
+def spec_path(output_dir: Path, spec_name: str) -> Path:
+    """Path of the saved copy of a spec."""
+    return output_dir / f"latest-{spec_name}.json"
+
+
+def load_validators(spec_file: Path) -> dict[str, str]:
+    """Load the ETag/Last-Modified validators stored next to a saved spec."""
+    validators_file = spec_file.with_suffix('.etag')
+    if not spec_file.exists() or not validators_file.exists():
+        return {}
+    try:
+        validators = loads_json(validators_file.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    # Only ever sent back as request headers; ignore anything malformed
+    if not isinstance(validators, dict) or not all(
+        isinstance(k, str) and isinstance(v, str) for k, v in validators.items()
+    ):
+        return {}
+    return validators
+
+
+def fetch_url(url: str, lines: list[str], api_key: str | None = None, requires_auth: bool = False,
+              cached_file: Path | None = None) -> FetchResult | None:
+    """Fetch JSON from URL with optional auth, revalidating cached_file; errors go to lines."""
     if requires_auth:
         if not api_key:
-            print(f"  ERROR: API key required but not set", file=sys.stderr)
+            lines.append(f"  ERROR: API key required but not set")
             return None
         url = f"{url}&key={api_key}" if '?' in url else f"{url}?key={api_key}"
 
+    headers = {}
+    validators = load_validators(cached_file) if cached_file else {}
+    if 'etag' in validators:
+        headers['If-None-Match'] = validators['etag']
+    if 'last_modified' in validators:
+        headers['If-Modified-Since'] = validators['last_modified']
+
     try:
-        req = Request(url, headers={'User-Agent': 'OpenAPI-Updater/1.0'})
-        with urlopen(req, timeout=30) as response:
-            data = response.read().decode('utf-8')
-            return json.loads(data)
-    except HTTPError as e:
-        if e.code == 404:
+        response = POOL.request('GET', url, headers=headers, timeout=30)
+        if response.status == 304 and headers:
+            return FetchResult(loads_json(cached_file.read_bytes()), validators, not_modified=True)
+        if response.status == 404:
             return None
-        print(f"  ERROR: HTTP {e.code}: {e.reason}", file=sys.stderr)
-        return None
-    except URLError as e:
-        print(f"  ERROR: Network error: {e.reason}", file=sys.stderr)
+        if response.status != 200:
+            lines.append(f"  ERROR: HTTP {response.status}: {response.reason}")
+            return None
+        # Byte-level sniff so error pages and non-OpenAPI JSON (e.g. Swagger
+        # 2.0) are rejected without paying for a full parse
+        if not OPENAPI_KEY_RE.search(response.body):
+            lines.append(f"  ERROR: Response is not an OpenAPI spec")
+            return None
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['etag'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['last_modified'] = response.headers['Last-Modified']
+        return FetchResult(loads_json(response.body), validators, body=response.body)
+    except (OSError, http.client.HTTPException) as e:
+        lines.append(f"  ERROR: Network error: {e}")
         return None
     except json.JSONDecodeError as e:
-        print(f"  ERROR: Invalid JSON: {e}", file=sys.stderr)
+        lines.append(f"  ERROR: Invalid JSON: {e}")
         return None
 
 
 def count_endpoints(spec: dict) -> int:
     """Count total endpoints in spec."""
-    count = 0
-    for path_data in spec.get('paths', {}).values():
-        for method in ['get', 'post', 'put', 'patch', 'delete']:
-            if method in path_data:
-                count += 1
-    return count
+    return sum(
+        len(HTTP_METHODS & path_data.keys())
+        for path_data in spec.get('paths', {}).values()
+        if isinstance(path_data, dict)
+    )
 
 
 def count_schemas(spec: dict) -> int:
@@ -110,84 +326,163 @@ def count_schemas(spec: dict) -> int:
     return len(spec.get('components', {}).get('schemas', {}))
 
 
-def save_spec(spec: dict, output_dir: Path, spec_name: str) -> Path:
-    """Save spec to output directory."""
+def save_spec(data: bytes, output_dir: Path, spec_name: str,
+              validators: dict[str, str] | None = None) -> Path:
+    """Save serialized spec (and its cache validators, if any) to output directory."""
     output_dir.mkdir(parents=True, exist_ok=True)
-    filepath = output_dir / f"latest-{spec_name}.json"
-    with open(filepath, 'w') as f:
-        json.dump(spec, f, indent=2)
+    filepath = spec_path(output_dir, spec_name)
+    filepath.write_bytes(data)
+
+    validators_file = filepath.with_suffix('.etag')
+    if validators:
+        validators_file.write_bytes(dumps_json(validators))
+    elif validators_file.exists():
+        validators_file.unlink()
     return filepath
 
 
-def print_spec_info(spec: dict, filepath: Path):
-    """Print spec metadata."""
+def format_spec_info(spec: dict, filepath: Path | None) -> list[str]:
+    """Format spec metadata as report lines."""
     info = spec.get('info', {})
-    print(f"  Saved to: {filepath}")
-    print(f"  OpenAPI: {spec.get('openapi', 'unknown')}")
-    print(f"  Version: {info.get('version', 'unknown')}")
-    print(f"  Title: {info.get('title', 'unknown')}")
-    print(f"  Endpoints: {count_endpoints(spec)}")
-    print(f"  Schemas: {count_schemas(spec)}")
+    lines = [f"  Saved to: {filepath}"] if filepath else []
+    return lines + [
+        f"  OpenAPI: {spec.get('openapi', 'unknown')}",
+        f"  Version: {info.get('version', 'unknown')}",
+        f"  Title: {info.get('title', 'unknown')}",
+        f"  Endpoints: {count_endpoints(spec)}",
+        f"  Schemas: {count_schemas(spec)}",
+    ]
+
+
+def fetch_one(name: str, spec_config: dict, output_dir: Path, api_key: str | None,
+              stats_only: bool = False) -> tuple[list[str], bool]:
+    """Fetch and save a single spec; returns (report_lines, success)."""
+    lines = [f"\n[{name}] {spec_config.get('name', 'Unknown')}"]
+    url = spec_config['url']
+    requires_auth = spec_config.get('requires_auth', False)
+    experimental = spec_config.get('experimental', False)
+
+    if experimental:
+        lines.append(f"  (experimental)")
+
+    lines.append(f"  Fetching from {url.split('?')[0]}...")
+
+    cached_file = spec_path(output_dir, name)
+    result = fetch_url(url, lines, api_key, requires_auth, cached_file)
+    if result is None:
+        lines.append(f"  FAILED to fetch spec")
+        return lines, False
+
+    spec = result.spec
+    if 'openapi' not in spec:
+        lines.append(f"  ERROR: Not a valid OpenAPI spec")
+        return lines, False
+
+    if result.not_modified:
+        lines.append(f"  Not modified since last fetch (using cached copy: {cached_file})")
+        filepath = None
+    else:
+        if stats_only:
+            # Raw bytes are not the canonical format; don't let a later
+            # normal run skip re-formatting them on a 304.
+            filepath = save_spec(result.body, output_dir, name)
+        else:
+            filepath = save_spec(dumps_json(spec), output_dir, name, result.validators)
+    lines.extend(format_spec_info(spec, filepath))
+    return lines, True
+
+
+def fetch_registered_specs(config: dict, spec_filter: str | None, output_dir: Path, api_key: str | None,
+                           stats_only: bool = False, jobs: int | None = None) -> int:
+    """Fetch all registered specs (or a specific one) concurrently."""
+    specs = {
+        name: spec_config
+        for name, spec_config in config.get('specs', {}).items()
+        if not spec_filter or name == spec_filter
+    }
+    if not specs:
+        return 0
 
+    with ThreadPoolExecutor(max_workers=min(jobs or MAX_WORKERS, len(specs))) as executor:
+        futures = [
+            executor.submit(fetch_one, name, spec_config, output_dir, api_key, stats_only)
+            for name, spec_config in specs.items()
+        ]
+        results = [future.result() for future in futures]
 
-def fetch_registered_specs(config: dict, spec_filter: str | None, output_dir: Path, api_key: str | None) -> int:
-    """Fetch all registered specs (or a specific one)."""
-    specs = config.get('specs', {})
     fetched = 0
+    for lines, success in results:
+        print('\n'.join(lines))
+        if success:
+            fetched += 1
 
-    for name, spec_config in specs.items():
-        if spec_filter and name != spec_filter:
-            continue
-
-        print(f"\n[{name}] {spec_config.get('name', 'Unknown')}")
-        url = spec_config['url']
-        requires_auth = spec_config.get('requires_auth', False)
-        experimental = spec_config.get('experimental', False)
+    return fetched
 
-        if experimental:
-            print(f"  (experimental)")
 
-        print(f"  Fetching from {url.split('?')[0]}...")
+def probe_url(url: str) -> int | None:
+    """Probe a spec URL; return the HTTP status, or None on network errors."""
+    try:
+        # HEAD is enough to tell whether the spec exists
+        return POOL.request('HEAD', url, timeout=5).status
+    except (OSError, http.client.HTTPException):
+        return None
 
-        spec = fetch_url(url, api_key, requires_auth)
-        if spec is None:
-            print(f"  FAILED to fetch spec")
-            continue
 
-        if 'openapi' not in spec:
-            print(f"  ERROR: Not a valid OpenAPI spec")
-            continue
+def load_negative_probes(cache_file: Path) -> dict[str, float]:
+    """Load recent 404 discovery probes (url -> probe time), dropping expired ones."""
+    try:
+        probes = loads_json(cache_file.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    # The file sits in the shared temp dir; ignore anything we didn't write
+    if not isinstance(probes, dict):
+        return {}
+    now = time.time()
+    return {
+        url: ts for url, ts in probes.items()
+        if isinstance(url, str) and isinstance(ts, (int, float)) and not isinstance(ts, bool)
+        and now - ts < DISCOVERY_NEGATIVE_TTL
+    }
 
-        filepath = save_spec(spec, output_dir, name)
-        print_spec_info(spec, filepath)
-        fetched += 1
 
-    return fetched
+def save_negative_probes(cache_file: Path, probes: dict[str, float]):
+    """Persist 404 discovery probes (best effort)."""
+    tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(dumps_json(probes))
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
 
 
-def discover_new_specs(config: dict) -> list[tuple[str, str]]:
-    """Probe for new specs at discovery patterns."""
+def discover_new_specs(config: dict, jobs: int | None = None,
+                       refresh: bool = False) -> list[tuple[str, str]]:
+    """Probe for new specs at discovery patterns, skipping recent 404s unless refresh is set."""
     patterns = config.get('discovery_patterns', [])
     names = config.get('discovery_names', [])
     registered = set(config.get('specs', {}).keys())
+    negative = {} if refresh else load_negative_probes(DISCOVERY_CACHE_FILE)
 
-    discovered = []
+    candidates = [
+        (name, pattern.replace('{name}', name))
+        for pattern in patterns
+        for name in names
+        if name not in registered
+    ]
+    candidates = [(name, url) for name, url in candidates if url not in negative]
+    if not candidates:
+        return []
 
-    for pattern in patterns:
-        for name in names:
-            if name in registered:
-                continue
+    with ThreadPoolExecutor(max_workers=min(jobs or DISCOVERY_WORKERS, len(candidates))) as executor:
+        statuses = list(executor.map(probe_url, [url for _, url in candidates]))
 
-            url = pattern.replace('{name}', name)
-            try:
-                req = Request(url, headers={'User-Agent': 'OpenAPI-Updater/1.0'})
-                with urlopen(req, timeout=5) as response:
-                    if response.status == 200:
-                        discovered.append((name, url))
-            except:
-                pass
+    now = time.time()
+    for (_, url), status in zip(candidates, statuses):
+        if status == 404:
+            negative[url] = now
+    save_negative_probes(DISCOVERY_CACHE_FILE, negative)
 
-    return discovered
+    return [candidate for candidate, status in zip(candidates, statuses) if status == 200]
 
 
 def main():
@@ -204,12 +499,30 @@ def main():
         '--no-discover', action='store_true',
         help="Skip discovery probing for new specs"
     )
+    parser.add_argument(
+        '--refresh-discovery', action='store_true',
+        help="Re-probe discovery URLs that recently returned 404"
+    )
+    parser.add_argument(
+        '--stats-only', action='store_true',
+        help="Save fetched specs byte-for-byte as received (not re-indented, "
+             "no ETag cached); stats still come from the parsed spec"
+    )
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=None,
+        help=f"Max concurrent requests (default: {MAX_WORKERS} for specs, "
+             f"{DISCOVERY_WORKERS} for discovery)"
+    )
     parser.add_argument(
         '--output', '-o', type=Path, default=None,
         help="Output directory (overrides config)"
     )
     args = parser.parse_args()
 
+    if args.jobs is not None and args.jobs < 1:
+        print(f"Error: --jobs must be at least 1")
+        sys.exit(2)
+
     # Validate config directory
     if not args.config_dir.exists():
         print(f"Error: Config directory not found: {args.config_dir}")
@@ -248,22 +561,27 @@ def main():
             if spec_config.get('requires_auth') and not api_key:
                 print(f"\nWARNING: API key not set - will skip '{name}' spec")
 
-    # Fetch specs
-    fetched = fetch_registered_specs(config, args.spec, output_dir, api_key)
-
-    # Auto-discover new specs
-    if not args.no_discover and not args.spec:
-        print(f"\n--- Discovery ---")
-        print(f"Probing for new specs...")
-        discovered = discover_new_specs(config)
-
-        if discovered:
-            print(f"\n⚠️  NEW SPECS DISCOVERED:")
-            for name, url in discovered:
-                print(f"  - {name}: {url}")
-            print(f"\nTo add to registry, update: {args.config_dir / 'specs.json'}")
-        else:
-            print(f"No new specs found.")
+    try:
+        # Fetch specs
+        fetched = fetch_registered_specs(
+            config, args.spec, output_dir, api_key, args.stats_only, args.jobs
+        )
+
+        # Auto-discover new specs
+        if not args.no_discover and not args.spec:
+            print(f"\n--- Discovery ---")
+            print(f"Probing for new specs...")
+            discovered = discover_new_specs(config, args.jobs, args.refresh_discovery)
+
+            if discovered:
+                print(f"\n⚠️  NEW SPECS DISCOVERED:")
+                for name, url in discovered:
+                    print(f"  - {name}: {url}")
+                print(f"\nTo add to registry, update: {args.config_dir / 'specs.json'}")
+            else:
+                print(f"No new specs found.")
+    finally:
+        POOL.close()
 
     print(f"\n--- Summary ---")
     print(f"Fetched: {fetched} spec(s)")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Run all verification scripts in a single process.
+
+Equivalent to running each verify_*.py script in turn, but Python starts
+once and shared config files are parsed once (see config_cache.py).
+
+Usage:
+    python3 verify_all.py --config-dir CONFIG_DIR
+
+Exit codes:
+    0 - All verifications passed
+    1 - At least one verification found issues
+    2 - Error (wrong directory, missing files, etc.)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import verify_examples
+import verify_exports
+import verify_model_properties
+import verify_readme
+import verify_readme_code
+
+VERIFIERS = [
+    ('verify_exports', verify_exports),
+    ('verify_readme', verify_readme),
+    ('verify_examples', verify_examples),
+    ('verify_model_properties', verify_model_properties),
+    ('verify_readme_code', verify_readme_code),
+]
+
+
+def run_verifier(name: str, module, config_dir: Path) -> int:
+    """Run one script's main() with its own argv and return its exit code."""
+    saved_argv = sys.argv
+    sys.argv = [f'{name}.py', '--config-dir', str(config_dir)]
+    try:
+        module.main()
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    finally:
+        sys.argv = saved_argv
+        sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run all verification scripts in one process'
+    )
+    parser.add_argument(
+        '--config-dir', type=Path, required=True,
+        help='Directory containing config files'
+    )
+    args = parser.parse_args()
+
+    if not args.config_dir.exists():
+        print(f"Error: Config directory not found: {args.config_dir}")
+        sys.exit(2)
+
+    results = []
+    for name, module in VERIFIERS:
+        print(f"=== {name} ===")
+        results.append((name, run_verifier(name, module, args.config_dir)))
+        print()
+
+    print("Summary:")
+    for name, code in results:
+        status = '✓' if code == 0 else ('✗' if code == 1 else '!')
+        print(f"  {status} {name} (exit {code})")
+
+    sys.exit(max(code for _, code in results))
+
+
+if __name__ == '__main__':
+    main()
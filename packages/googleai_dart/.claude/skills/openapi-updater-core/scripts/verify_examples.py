@@ -14,11 +14,13 @@ Exit codes:
 """
 
 import argparse
-import json
-import re
+import functools
+import os
 import sys
 from pathlib import Path
 
+from config_cache import load_json
+
 
 def load_config(config_dir: Path) -> dict:
     """Load configuration from config directory."""
@@ -33,53 +35,60 @@ def load_config(config_dir: Path) -> dict:
     # Load package.json for paths
     pkg_file = config_dir / 'package.json'
     if pkg_file.exists():
-        with open(pkg_file) as f:
-            pkg = json.load(f)
-            config['resources_dir'] = pkg.get('resources_dir', config['resources_dir'])
-            config['examples_dir'] = pkg.get('examples_dir', config['examples_dir'])
+        pkg = load_json(pkg_file)
+        config['resources_dir'] = pkg.get('resources_dir', config['resources_dir'])
+        config['examples_dir'] = pkg.get('examples_dir', config['examples_dir'])
 
     # Load documentation.json for exclusions and mappings
     doc_file = config_dir / 'documentation.json'
     if doc_file.exists():
-        with open(doc_file) as f:
-            doc = json.load(f)
-            config['excluded_from_examples'] = doc.get('excluded_from_examples', [])
-            config['resource_to_example'] = doc.get('resource_to_example', {})
-            config['excluded_resources'] = doc.get('excluded_resources', [])
+        doc = load_json(doc_file)
+        config['excluded_from_examples'] = doc.get('excluded_from_examples', [])
+        config['resource_to_example'] = doc.get('resource_to_example', {})
+        config['excluded_resources'] = doc.get('excluded_resources', [])
 
     return config
 
 
+@functools.lru_cache(maxsize=None)
 def snake_to_camel(name: str) -> str:
     """Convert snake_case to camelCase."""
     components = name.split('_')
     return components[0] + ''.join(x.title() for x in components[1:])
 
 
-def find_resources(resources_dir: Path, config: dict) -> set[str]:
-    """Find all resource names from *_resource.dart files."""
-    resources = set()
+def find_resources(resources_dir: Path, config: dict) -> dict[str, str]:
+    """Find all resource names from *_resource.dart files.
+
+    Returns a mapping of camelCase resource name to its snake_case base name.
+    """
+    resources = {}
     excluded = set(config['excluded_resources'])
 
     if not resources_dir.exists():
         return resources
 
-    for item in resources_dir.iterdir():
+    with os.scandir(resources_dir) as entries:
+        items = list(entries)
+
+    for item in items:
         if item.name.startswith('.'):
             continue
 
         if item.is_dir():
-            resource_file = item / f'{item.name}_resource.dart'
-            if resource_file.exists():
+            with os.scandir(item.path) as children:
+                dart_files = [
+                    child.name for child in children
+                    if child.name.endswith('_resource.dart')
+                ]
+            if f'{item.name}_resource.dart' in dart_files:
                 name = item.name + '_resource'
+            elif dart_files:
+                name = dart_files[0][:-len('.dart')]
             else:
-                dart_files = list(item.glob('*_resource.dart'))
-                if dart_files:
-                    name = dart_files[0].stem
-                else:
-                    continue
-        elif item.is_file() and item.suffix == '.dart':
-            name = item.stem
+                continue
+        elif item.is_file() and item.name.endswith('.dart'):
+            name = item.name[:-len('.dart')]
         else:
             continue
 
@@ -92,7 +101,7 @@ def find_resources(resources_dir: Path, config: dict) -> set[str]:
         base_name = name.replace('_resource', '')
         resource_name = snake_to_camel(base_name)
 
-        resources.add(resource_name)
+        resources[resource_name] = base_name
 
     return resources
 
@@ -152,7 +161,7 @@ def main():
 
     # Remove excluded resources from check
     excluded = set(config['excluded_from_examples'])
-    resources_to_check = resources - excluded
+    resources_to_check = resources.keys() - excluded
 
     if args.verbose:
         print(f"Resources found: {sorted(resources)}")
@@ -178,9 +187,8 @@ def main():
     # Report missing examples
     print("RESOURCES WITHOUT EXAMPLES:")
     for r in sorted(missing):
-        snake_name = re.sub(r'([A-Z])', r'_\1', r).lower().lstrip('_')
         print(f"  - {r}")
-        print(f"      → Create: {config['examples_dir']}/{snake_name}_example.dart")
+        print(f"      → Create: {config['examples_dir']}/{resources[r]}_example.dart")
     print()
 
     print(f"Found {len(missing)} resource(s) without examples.")
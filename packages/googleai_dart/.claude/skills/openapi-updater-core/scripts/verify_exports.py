@@ -5,7 +5,10 @@ Verify all model files are exported in the barrel file.
 This is a config-driven script that loads package structure from config files.
 
 Usage:
-    python3 verify_exports.py --config-dir CONFIG_DIR
+    python3 verify_exports.py --config-dir CONFIG_DIR [--no-cache]
+
+Per-file results are cached in the temp directory and reused while a
+file's mtime and size are unchanged.
 
 Exit codes:
     0 - All files are exported
@@ -14,11 +17,77 @@ Exit codes:
 """
 
 import argparse
+import functools
 import json
+import os
 import re
 import sys
+import tempfile
 from pathlib import Path
 
+from config_cache import load_json
+
+EXPORT_RE = re.compile(r"export\s+'[^']*?([^/]+\.dart)'")
+TYPE_RE = re.compile(r'(?:class|enum|sealed class)\s+(\w+)')
+DIRECTIVE_RE = re.compile(rb'^[^\S\n]*(part of|import |export |library )', re.MULTILINE)
+DIRECTIVE_SCAN_BYTES = 4096
+
+# Below this many files, process start-up costs more than it saves
+PARALLEL_MIN_FILES = 200
+
+CACHE_FILE = Path(tempfile.gettempdir()) / 'verify_exports.cache.json'
+# Bump when the cached per-file results would change (TYPE_RE, DIRECTIVE_RE,
+# is_part_file, ...) so stale entries from older runs are discarded
+CACHE_VERSION = 1
+
+
+class AnalysisCache:
+    """Per-file analysis results, persisted between runs while files are unchanged."""
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self._data: dict[str, dict] = {}
+        self._checked: dict[str, dict] = {}
+        if path is not None and path.exists():
+            try:
+                with open(path) as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = None
+            if (isinstance(stored, dict) and stored.get('version') == CACHE_VERSION
+                    and isinstance(stored.get('files'), dict)):
+                self._data = stored['files']
+
+    def entry(self, file: Path) -> dict:
+        """Return the (possibly empty) cached results for an unchanged file."""
+        key = os.path.abspath(file)
+        if key in self._checked:
+            return self._checked[key]
+        st = file.stat()
+        entry = self._data.get(key)
+        if not isinstance(entry, dict) or entry.get('mtime_ns') != st.st_mtime_ns or entry.get('size') != st.st_size:
+            entry = self._data[key] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+        self._checked[key] = entry
+        return entry
+
+    def save(self):
+        """Write the cache back to disk (best effort)."""
+        if self.path is None:
+            return
+        # Keep other packages' entries (the file is shared), but drop deleted
+        # files so the cache doesn't grow without bound
+        files = {
+            key: entry for key, entry in self._data.items()
+            if key in self._checked or (isinstance(entry, dict) and os.path.exists(key))
+        }
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'files': files}, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
 
 def load_config(config_dir: Path) -> dict:
     """Load configuration from config directory."""
@@ -32,48 +101,65 @@ def load_config(config_dir: Path) -> dict:
     # Load package.json
     pkg_file = config_dir / 'package.json'
     if pkg_file.exists():
-        with open(pkg_file) as f:
-            pkg = json.load(f)
-            config['barrel_file'] = pkg.get('barrel_file', config['barrel_file'])
-            config['models_dir'] = pkg.get('models_dir', config['models_dir'])
-            config['skip_files'] = pkg.get('skip_files', config['skip_files'])
-            config['internal_barrel_files'] = pkg.get('internal_barrel_files', config['internal_barrel_files'])
+        pkg = load_json(pkg_file)
+        config['barrel_file'] = pkg.get('barrel_file', config['barrel_file'])
+        config['models_dir'] = pkg.get('models_dir', config['models_dir'])
+        config['skip_files'] = pkg.get('skip_files', config['skip_files'])
+        config['internal_barrel_files'] = pkg.get('internal_barrel_files', config['internal_barrel_files'])
 
     return config
 
 
+@functools.lru_cache(maxsize=None)
+def read_source(file: Path) -> str:
+    """Read a source file once; later calls reuse the cached contents."""
+    return file.read_text(encoding='utf-8')
+
+
 def is_part_file(file: Path) -> bool:
     """Check if a file uses 'part of' directive (included in another file)."""
+    # The first directive decides; it sits near the top of the file, so
+    # scan raw bytes of the head and only read further if none was found.
     try:
-        content = file.read_text()
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line or line.startswith('//'):
-                continue
-            if line.startswith('part of'):
-                return True
-            if line.startswith(('import ', 'export ', 'library ')):
-                return False
-        return False
-    except Exception:
+        with open(file, 'rb') as f:
+            head = f.read(DIRECTIVE_SCAN_BYTES)
+            match = DIRECTIVE_RE.search(head)
+            if match is None and len(head) == DIRECTIVE_SCAN_BYTES:
+                match = DIRECTIVE_RE.search(head + f.read())
+        return match is not None and match.group(1) == b'part of'
+    except OSError:
         return False
 
 
-def find_model_files(models_dir: Path, config: dict) -> list[Path]:
+def walk_dart_files(directory: str):
+    """Yield DirEntry objects for .dart files under directory, skipping hidden entries."""
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk_dart_files(entry.path)
+            elif entry.name.endswith('.dart'):
+                yield entry
+
+
+def find_model_files(models_dir: Path, config: dict, cache: AnalysisCache) -> list[Path]:
     """Find all .dart files in models subdirectories (recursive)."""
     files = []
 
     skip_files = set(config['skip_files'])
     internal_barrel_files = set(config['internal_barrel_files'])
 
-    for dart_file in models_dir.glob('**/*.dart'):
-        if any(part.startswith('.') for part in dart_file.parts):
+    for entry in walk_dart_files(str(models_dir)):
+        if entry.name in skip_files:
             continue
-        if dart_file.name in skip_files:
+        if entry.name in internal_barrel_files:
             continue
-        if dart_file.name in internal_barrel_files:
-            continue
-        if is_part_file(dart_file):
+        dart_file = Path(entry.path)
+        cached = cache.entry(dart_file)
+        if 'is_part' not in cached:
+            cached['is_part'] = is_part_file(dart_file)
+        if cached['is_part']:
             continue
         files.append(dart_file)
 
@@ -83,53 +169,111 @@ def find_model_files(models_dir: Path, config: dict) -> list[Path]:
 def get_barrel_exports(barrel_file: Path) -> set[str]:
     """Extract exported filenames from barrel file."""
     exports = set()
-    content = barrel_file.read_text()
-    pattern = r"export\s+'[^']*?([^/]+\.dart)'"
-    for match in re.finditer(pattern, content):
+    content = read_source(barrel_file)
+    for match in EXPORT_RE.finditer(content):
         exports.add(match.group(1))
     return exports
 
 
 def extract_types_from_file(file: Path) -> set[str]:
     """Extract class, enum, and sealed class names from a Dart file."""
-    content = file.read_text()
-    pattern = r'(?:class|enum|sealed class)\s+(\w+)'
-    return set(re.findall(pattern, content))
-
-
-def find_type_usages(file: Path, type_names: set[str]) -> set[str]:
-    """Find which types from type_names are used in the file."""
-    content = file.read_text()
-    used = set()
-    for type_name in type_names:
-        if re.search(rf'\b{type_name}\b', content):
-            used.add(type_name)
-    return used
+    content = read_source(file)
+    return set(TYPE_RE.findall(content))
+
+
+def trie_pattern(words) -> str:
+    """Build a regex alternation for words with shared prefixes factored out."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node: dict) -> str | None:
+        if list(node) == ['']:
+            return None
+        branches = []
+        single_chars = []
+        for ch in sorted(k for k in node if k):
+            rest = emit(node[ch])
+            if rest is None:
+                single_chars.append(re.escape(ch))
+            else:
+                branches.append(re.escape(ch) + rest)
+        only_chars = not branches
+        if single_chars:
+            branches.append(
+                single_chars[0] if len(single_chars) == 1
+                else '[' + ''.join(single_chars) + ']'
+            )
+        result = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            result = result + '?' if only_chars else '(?:' + result + ')?'
+        return result
+
+    return emit(trie) or ''
+
+
+@functools.lru_cache(maxsize=None)
+def compile_usage_pattern(source: str) -> re.Pattern:
+    """Compile the usage pattern once per process."""
+    return re.compile(source)
+
+
+def find_used_types(file: Path, pattern: str) -> set[str]:
+    """Find which types matched by pattern are used in the file."""
+    return set(compile_usage_pattern(pattern).findall(read_source(file)))
 
 
 def check_transitive_dependencies(
     unexported_files: list[Path],
     exported_files: list[Path],
     models_dir: Path,
+    cache: AnalysisCache,
 ) -> dict[str, list[str]]:
     """Check if unexported types are used by exported types."""
-    unexported_types: dict[str, Path] = {}
-    for f in unexported_files:
-        for type_name in extract_types_from_file(f):
-            unexported_types[type_name] = f
-
-    dependencies: dict[str, list[str]] = {}
-
-    for exported_file in exported_files:
-        used_types = find_type_usages(exported_file, set(unexported_types.keys()))
-        for type_name in used_types:
-            unexported_file = unexported_types[type_name]
-            file_key = unexported_file.name
-            if file_key not in dependencies:
-                dependencies[file_key] = []
-            dependencies[file_key].append(f"{type_name} (used by {exported_file.name})")
+    if len(unexported_files) + len(exported_files) >= PARALLEL_MIN_FILES:
+        # Imported here: multiprocessing adds measurable start-up time to
+        # every run, and most runs never need it.
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor()
+        map_files = functools.partial(executor.map, chunksize=16)
+    else:
+        executor = None
+        map_files = map
 
-    return dependencies
+    try:
+        pending = [f for f in unexported_files if 'types' not in cache.entry(f)]
+        for f, types in zip(pending, map_files(extract_types_from_file, pending)):
+            cache.entry(f)['types'] = sorted(types)
+
+        unexported_types: dict[str, Path] = {}
+        for f in unexported_files:
+            for type_name in cache.entry(f)['types']:
+                unexported_types[type_name] = f
+
+        dependencies: dict[str, list[str]] = {}
+        if not unexported_types:
+            return dependencies
+
+        # One trie-shaped alternation scanned once per file instead of one
+        # regex per type
+        pattern = r'\b(' + trie_pattern(unexported_types) + r')\b'
+        scan = functools.partial(find_used_types, pattern=pattern)
+
+        for exported_file, used_types in zip(exported_files, map_files(scan, exported_files)):
+            for type_name in sorted(used_types):
+                unexported_file = unexported_types[type_name]
+                file_key = unexported_file.name
+                if file_key not in dependencies:
+                    dependencies[file_key] = []
+                dependencies[file_key].append(f"{type_name} (used by {exported_file.name})")
+
+        return dependencies
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
 
 def main():
@@ -151,6 +295,11 @@ def main():
         default=True,
         help='Check for transitive dependencies (default: True)'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Ignore and do not update the per-file cache ({CACHE_FILE})'
+    )
     args = parser.parse_args()
 
     # Validate config directory
@@ -177,7 +326,9 @@ def main():
     print()
 
     # Find all model files and check exports
-    model_files = find_model_files(models_dir, config)
+    cache = AnalysisCache(None if args.no_cache else CACHE_FILE)
+    model_files = find_model_files(models_dir, config, cache)
+    cache.save()
     exports = get_barrel_exports(barrel_file)
 
     unexported = []
@@ -207,8 +358,9 @@ def main():
     # Check transitive dependencies
     if args.check_transitive and unexported:
         dependencies = check_transitive_dependencies(
-            unexported, exported_paths, models_dir
+            unexported, exported_paths, models_dir, cache
         )
+        cache.save()
 
         if dependencies:
             print("USED BY EXPORTED CLASSES (should be exported):")
@@ -6,7 +6,10 @@ This is a config-driven script that loads the list of critical models
 from a JSON config file.
 
 Usage:
-    python3 verify_model_properties.py --config-dir CONFIG_DIR [--spec SPEC_FILE]
+    python3 verify_model_properties.py --config-dir CONFIG_DIR [--spec SPEC_FILE] [--no-cache]
+
+The spec's schema index is cached in the temp directory and reused without
+re-parsing the spec while its mtime and size are unchanged.
 
 Exit codes:
     0 - All properties match
@@ -15,11 +18,28 @@ Exit codes:
 """
 
 import argparse
+import functools
 import json
+import os
 import re
 import sys
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
+
+from config_cache import load_json, loads_json
+
+# final Type? propertyName;  /  final Type propertyName;
+FIELD_RE = re.compile(rb'final\s+[\w<>?,\s]+\s+(\w+)\s*;')
+# Constructor named parameters: this.propertyName
+CONSTRUCTOR_PARAM_RE = re.compile(rb'this\.(\w+)')
+# JSON keys in fromJson/toJson maps: 'propertyName':
+JSON_KEY_RE = re.compile(rb"'(\w+)':\s*")
+
+INDEX_CACHE_FILE = Path(tempfile.gettempdir()) / 'verify_model_properties.index.json'
+# Bump when the cached (normalized) index would change, e.g. after editing
+# normalize_property_name or to_camel_case
+INDEX_CACHE_VERSION = 1
 
 
 def load_config(config_dir: Path) -> dict:
@@ -32,43 +52,55 @@ def load_config(config_dir: Path) -> dict:
     # Load models.json
     models_file = config_dir / 'models.json'
     if models_file.exists():
-        with open(models_file) as f:
-            models = json.load(f)
-            config['critical_models'] = models.get('critical_models', [])
-            config['expected_properties'] = models.get('expected_properties', {})
+        models = load_json(models_file)
+        config['critical_models'] = models.get('critical_models', [])
+        config['expected_properties'] = models.get('expected_properties', {})
 
     return config
 
 
 def load_openapi_spec(spec_path: Path) -> dict:
     """Load OpenAPI specification."""
-    with open(spec_path) as f:
-        return json.load(f)
+    return loads_json(spec_path.read_bytes())
 
 
-def get_spec_properties(spec: dict, schema_name: str) -> set[str]:
-    """Extract property names from OpenAPI schema."""
+def build_schema_index(
+    spec: dict,
+    normalizer: Optional[Callable[[str], str]] = None
+) -> dict[str, set[str]]:
+    """Map every schema name in the spec to its (optionally normalized) property names."""
     schemas = spec.get('components', {}).get('schemas', {})
-    schema = schemas.get(schema_name, {})
+    return {
+        name: collect_schema_properties(schemas, schema, normalizer)
+        for name, schema in schemas.items()
+    }
+
 
+def collect_schema_properties(
+    schemas: dict,
+    schema: dict,
+    normalizer: Optional[Callable[[str], str]] = None
+) -> set[str]:
+    """Collect property names of one schema, including allOf/oneOf refs."""
+    normalize = normalizer or (lambda name: name)
     properties = set()
 
     # Direct properties (skip internal properties starting with underscore)
     for prop in schema.get('properties', {}).keys():
         if not prop.startswith('_'):
-            properties.add(prop)
+            properties.add(normalize(prop))
 
     # Handle allOf (merged schemas)
     for item in schema.get('allOf', []):
         if 'properties' in item:
             for prop in item['properties'].keys():
-                properties.add(prop)
+                properties.add(normalize(prop))
         elif '$ref' in item:
             ref_name = item['$ref'].split('/')[-1]
             # Don't recurse infinitely, just get direct properties
             ref_schema = schemas.get(ref_name, {})
             for prop in ref_schema.get('properties', {}).keys():
-                properties.add(prop)
+                properties.add(normalize(prop))
 
     # Handle oneOf (for sealed classes like Part)
     for item in schema.get('oneOf', []):
@@ -76,55 +108,60 @@ def get_spec_properties(spec: dict, schema_name: str) -> set[str]:
             ref_name = item['$ref'].split('/')[-1]
             ref_schema = schemas.get(ref_name, {})
             for prop in ref_schema.get('properties', {}).keys():
-                properties.add(prop)
+                properties.add(normalize(prop))
 
     return properties
 
 
-def get_dart_properties(dart_file: Path) -> set[str]:
-    """Extract property names from Dart class file."""
+def get_dart_properties(
+    dart_file: Path,
+    normalizer: Optional[Callable[[str], str]] = None
+) -> set[str]:
+    """Extract property names from Dart class file, optionally normalized."""
+    normalize = normalizer or (lambda name: name)
     if not dart_file.exists():
         return set()
 
-    content = dart_file.read_text()
+    content = dart_file.read_bytes()
     properties = set()
 
     # Match final field declarations: final Type? propertyName;
     # Also handles: final Type propertyName;
-    field_pattern = r'final\s+[\w<>?,\s]+\s+(\w+)\s*;'
-    for match in re.finditer(field_pattern, content):
-        properties.add(match.group(1))
+    for match in FIELD_RE.finditer(content):
+        properties.add(normalize(match.group(1).decode('ascii')))
 
     # Match constructor named parameters: this.propertyName
-    constructor_pattern = r'this\.(\w+)'
-    for match in re.finditer(constructor_pattern, content):
-        properties.add(match.group(1))
+    for match in CONSTRUCTOR_PARAM_RE.finditer(content):
+        properties.add(normalize(match.group(1).decode('ascii')))
 
     # Match factory fromJson parameters (for sealed classes)
     # These may define properties via case statements
-    factory_pattern = r"'(\w+)':\s*"
-    for match in re.finditer(factory_pattern, content):
-        prop = match.group(1)
+    for match in JSON_KEY_RE.finditer(content):
+        prop = match.group(1).decode('ascii')
         # Only add if it looks like a JSON property name (camelCase)
         if prop[0].islower():
-            properties.add(prop)
+            properties.add(normalize(prop))
 
     return properties
 
 
+@functools.lru_cache(maxsize=4096)
 def to_camel_case(name: str) -> str:
     """Convert snake_case or PascalCase to camelCase for comparison."""
-    # Already camelCase
-    if '_' not in name and name[0].islower():
-        return name
-    # snake_case to camelCase
+    # snake_case to camelCase, in one join over the parts
     if '_' in name:
-        parts = name.split('_')
-        return parts[0].lower() + ''.join(p.title() for p in parts[1:])
+        return ''.join(
+            part.title() if i else part.lower()
+            for i, part in enumerate(name.split('_'))
+        )
+    # Already camelCase (the common case for Dart properties)
+    if name[:1].islower():
+        return name
     # PascalCase to camelCase
-    return name[0].lower() + name[1:]
+    return name[:1].lower() + name[1:]
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_property_name(name: str) -> str:
     """Normalize property name for comparison."""
     # Remove common prefixes/suffixes used in OpenAPI vs Dart
@@ -132,8 +169,44 @@ def normalize_property_name(name: str) -> str:
     return normalized
 
 
+def load_schema_index(spec_path: Path, cache_file: Path | None) -> dict[str, set[str]]:
+    """Return the normalized schema index for a spec, cached while the spec is unchanged."""
+    st = spec_path.stat()
+    signature = {
+        'version': INDEX_CACHE_VERSION,
+        'spec': os.path.abspath(spec_path),
+        'mtime_ns': st.st_mtime_ns,
+        'size': st.st_size,
+    }
+
+    if cache_file is not None and cache_file.exists():
+        try:
+            cached = loads_json(cache_file.read_bytes())
+            if cached.get('signature') == signature:
+                return {name: set(props) for name, props in cached['schemas'].items()}
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    index = build_schema_index(load_openapi_spec(spec_path), normalize_property_name)
+
+    if cache_file is not None:
+        data = {
+            'signature': signature,
+            'schemas': {name: sorted(props) for name, props in index.items()},
+        }
+        tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass
+
+    return index
+
+
 def verify_model(
-    spec: Optional[dict],
+    spec_index: Optional[dict[str, set[str]]],
     schema_name: str,
     dart_file: Path,
     expected_properties: Optional[set[str]] = None,
@@ -144,19 +217,15 @@ def verify_model(
 
     Returns (is_complete, missing_in_dart, extra_in_dart)
     """
-    # Get expected properties from spec or explicit list
+    # Get expected properties from spec or explicit list, normalized for comparison
     if expected_properties:
-        spec_props = expected_properties
-    elif spec:
-        spec_props = get_spec_properties(spec, schema_name)
+        normalized_spec = {normalize_property_name(p) for p in expected_properties}
+    elif spec_index is not None:
+        normalized_spec = spec_index.get(schema_name, set())
     else:
         return True, set(), set()
 
-    dart_props = get_dart_properties(dart_file)
-
-    # Normalize both sets for comparison
-    normalized_spec = {normalize_property_name(p) for p in spec_props}
-    normalized_dart = {normalize_property_name(p) for p in dart_props}
+    normalized_dart = get_dart_properties(dart_file, normalize_property_name)
 
     # Skip internal Dart properties
     internal_props = {'hashCode', 'runtimeType', 'copyWith', 'toJson', 'fromJson'}
@@ -196,6 +265,11 @@ def main():
         type=str,
         help='Check only a specific model (e.g., "Tool")'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Ignore and do not update the schema index cache ({INDEX_CACHE_FILE})'
+    )
     args = parser.parse_args()
 
     # Validate config directory
@@ -212,10 +286,10 @@ def main():
         print("Warning: No critical models defined in config/models.json")
         sys.exit(0)
 
-    # Load spec if available
-    spec = None
+    # Load spec if available and index its schemas once (or reuse the cached index)
+    spec_index = None
     if args.spec.exists():
-        spec = load_openapi_spec(args.spec)
+        spec_index = load_schema_index(args.spec, None if args.no_cache else INDEX_CACHE_FILE)
     elif not expected_properties:
         print(f"Warning: OpenAPI spec not found at {args.spec}")
         print("Will use expected_properties from config if available.")
@@ -251,7 +325,7 @@ def main():
             model_expected = set(expected_properties[model_name])
 
         is_complete, missing, extra = verify_model(
-            spec, spec_schema, dart_file, model_expected, args.verbose
+            spec_index, spec_schema, dart_file, model_expected, args.verbose
         )
 
         if is_complete:
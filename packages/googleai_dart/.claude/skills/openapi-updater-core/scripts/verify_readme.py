@@ -14,11 +14,23 @@ Exit codes:
 """
 
 import argparse
-import json
+import os
 import re
 import sys
 from pathlib import Path
 
+from config_cache import line_number, load_json, newline_offsets
+
+# Anchored to the start of a line so only real "### ..." headings are tried
+RESOURCE_HEADING_RE = re.compile(
+    r"^### [\w ]+ Resource \(`client\.(\w+)`\)", re.MULTILINE
+)
+# Whitespace is restricted to a single line ([^\S\n]) so matches never span lines
+TOOL_FIELD_RE = re.compile(rb'final[^\S\n]+[\w<>?]+[^\S\n]+(\w+);')
+# Dart file names in the README; only example files (foo_example.dart,
+# example.dart) are captured, other names match with an empty group
+EXAMPLE_FILE_RE = re.compile(r'(\w*example\.dart)|\w+\.dart')
+
 
 def load_config(config_dir: Path) -> dict:
     """Load configuration from config directory."""
@@ -33,21 +45,19 @@ def load_config(config_dir: Path) -> dict:
     # Load documentation.json
     doc_file = config_dir / 'documentation.json'
     if doc_file.exists():
-        with open(doc_file) as f:
-            doc = json.load(f)
-            config['removed_apis'] = doc.get('removed_apis', [])
-            config['tool_properties'] = doc.get('tool_properties', {})
-            config['excluded_resources'] = doc.get('excluded_resources', [])
+        doc = load_json(doc_file)
+        config['removed_apis'] = doc.get('removed_apis', [])
+        config['tool_properties'] = doc.get('tool_properties', {})
+        config['excluded_resources'] = doc.get('excluded_resources', [])
 
     # Load package.json for paths
     pkg_file = config_dir / 'package.json'
     if pkg_file.exists():
-        with open(pkg_file) as f:
-            pkg = json.load(f)
-            config['resources_dir'] = pkg.get('resources_dir', config['resources_dir'])
-            # Tool file is typically in models/tools/
-            models_dir = pkg.get('models_dir', 'lib/src/models')
-            config['tool_file'] = f"{models_dir}/tools/tool.dart"
+        pkg = load_json(pkg_file)
+        config['resources_dir'] = pkg.get('resources_dir', config['resources_dir'])
+        # Tool file is typically in models/tools/
+        models_dir = pkg.get('models_dir', 'lib/src/models')
+        config['tool_file'] = f"{models_dir}/tools/tool.dart"
 
     return config
 
@@ -67,22 +77,27 @@ def find_implemented_resources(config: dict) -> set[str]:
     if not resources_dir.exists():
         return resources
 
-    for item in resources_dir.iterdir():
+    with os.scandir(resources_dir) as entries:
+        items = list(entries)
+
+    for item in items:
         if item.name.startswith('.'):
             continue
 
         if item.is_dir():
-            resource_file = item / f'{item.name}_resource.dart'
-            if resource_file.exists():
+            with os.scandir(item.path) as children:
+                dart_files = [
+                    child.name for child in children
+                    if child.name.endswith('_resource.dart')
+                ]
+            if f'{item.name}_resource.dart' in dart_files:
                 name = item.name + '_resource'
+            elif dart_files:
+                name = dart_files[0][:-len('.dart')]
             else:
-                dart_files = list(item.glob('*_resource.dart'))
-                if dart_files:
-                    name = dart_files[0].stem
-                else:
-                    continue
-        elif item.is_file() and item.suffix == '.dart':
-            name = item.stem
+                continue
+        elif item.is_file() and item.name.endswith('.dart'):
+            name = item.name[:-len('.dart')]
         else:
             continue
 
@@ -102,8 +117,7 @@ def find_implemented_resources(config: dict) -> set[str]:
 
 def extract_documented_resources(readme: str) -> set[str]:
     """Extract resource names from README API Coverage section."""
-    pattern = r"### \w+(?:\s+\w+)* Resource \(`client\.(\w+)`\)"
-    return set(re.findall(pattern, readme))
+    return set(RESOURCE_HEADING_RE.findall(readme))
 
 
 def find_tool_properties(config: dict) -> dict[str, int]:
@@ -112,47 +126,69 @@ def find_tool_properties(config: dict) -> dict[str, int]:
     if not tool_file.exists():
         return {}
 
-    content = tool_file.read_text()
+    content = tool_file.read_bytes()
+    offsets = newline_offsets(content)
     properties = {}
 
-    for i, line in enumerate(content.split('\n'), 1):
-        match = re.search(r'final\s+[\w<>?]+\s+(\w+);', line)
-        if match:
-            properties[match.group(1)] = i
+    for match in TOOL_FIELD_RE.finditer(content):
+        properties[match.group(1).decode('ascii')] = line_number(offsets, match.start())
 
     return properties
 
 
-def check_tool_documentation(readme: str, config: dict) -> list[tuple[str, str]]:
-    """Check if all tool properties are documented in README."""
-    missing = []
-    readme_lower = readme.lower()
+def check_tool_documentation(readme_lower: str, config: dict) -> list[tuple[str, str]]:
+    """Check if all tool properties are documented in the lowercased README."""
     tool_properties = config['tool_properties']
+    terms_by_prop = {
+        prop: prop_config.get('search_terms', [prop.lower()])
+        for prop, prop_config in tool_properties.items()
+    }
 
-    for prop, prop_config in tool_properties.items():
-        description = prop_config.get('description', '')
-        search_terms = prop_config.get('search_terms', [prop.lower()])
+    props_by_term: dict[str, list[str]] = {}
+    for prop, search_terms in terms_by_prop.items():
+        for term in search_terms:
+            if term:
+                props_by_term.setdefault(term, []).append(prop)
+
+    found = set()
+    if props_by_term:
+        # Longest first so a term wins over any shorter term it starts with
+        terms = sorted(props_by_term, key=len, reverse=True)
+        pattern = re.compile('|'.join(re.escape(term) for term in terms))
+        for match in pattern.finditer(readme_lower):
+            found.update(props_by_term[match.group()])
+            if len(found) == len(terms_by_prop):
+                break
 
-        found = any(term in readme_lower for term in search_terms)
-        if not found:
-            missing.append((prop, description))
+    missing = []
+    for prop, prop_config in tool_properties.items():
+        if prop in found:
+            continue
+        if any(term in readme_lower for term in terms_by_prop[prop]):
+            continue
+        missing.append((prop, prop_config.get('description', '')))
 
     return missing
 
 
-def check_stale_references(readme: str, config: dict) -> list[tuple[int, str, str]]:
+def check_stale_references(readme: str, offsets: list[int], config: dict) -> list[tuple[int, str, str]]:
     """Find references to removed APIs with line numbers."""
-    issues = []
-    lines = readme.split('\n')
+    hits: set[tuple[int, int]] = set()
     removed_apis = config['removed_apis']
 
-    for i, line in enumerate(lines, 1):
-        for api_info in removed_apis:
-            api = api_info.get('api', '')
-            reason = api_info.get('reason', 'API removed')
-            if api in line:
-                issues.append((i, api, reason))
+    for index, api_info in enumerate(removed_apis):
+        api = api_info.get('api', '')
+        if not api:
+            continue
+        pos = readme.find(api)
+        while pos != -1:
+            hits.add((line_number(offsets, pos), index))
+            pos = readme.find(api, pos + 1)
 
+    issues = []
+    for line, index in sorted(hits):
+        api_info = removed_apis[index]
+        issues.append((line, api_info['api'], api_info.get('reason', 'API removed')))
     return issues
 
 
@@ -160,15 +196,18 @@ def check_example_files(readme: str) -> list[str]:
     """Check that referenced example files exist."""
     example_dir = Path('example')
 
-    pattern = r'[`/]?(\w+(?:_\w+)*\.dart)[`]?'
-    referenced = set(re.findall(pattern, readme))
+    referenced = set(EXAMPLE_FILE_RE.findall(readme))
+    referenced.discard('')
 
-    example_patterns = ['_example.dart', 'example.dart']
+    # List the directory once instead of stat-ing every referenced name
+    present = set()
+    if example_dir.is_dir():
+        with os.scandir(example_dir) as entries:
+            present = {entry.name for entry in entries}
 
     missing = []
     for filename in referenced:
-        is_example = any(p in filename for p in example_patterns)
-        if is_example and not (example_dir / filename).exists():
+        if filename not in present:
             missing.append(filename)
 
     return missing
@@ -212,6 +251,8 @@ def main():
     print()
 
     readme = readme_path.read_text()
+    readme_offsets = newline_offsets(readme)
+    readme_lower = readme.lower()
     total_issues = 0
 
     # Check 1: Resource validation
@@ -227,10 +268,10 @@ def main():
         print()
 
     # Check 2: Tool properties
-    missing_tools = check_tool_documentation(readme, config)
+    missing_tools = check_tool_documentation(readme_lower, config)
 
     # Check 3: Stale references
-    stale_refs = check_stale_references(readme, config)
+    stale_refs = check_stale_references(readme, readme_offsets, config)
 
     # Check 4: Example files
     missing_examples = check_example_files(readme)
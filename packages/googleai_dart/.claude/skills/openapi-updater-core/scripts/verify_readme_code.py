@@ -14,10 +14,22 @@ Exit codes:
 """
 
 import argparse
-import json
 import re
 import sys
 from pathlib import Path
+from typing import Optional
+
+from config_cache import line_number, load_json, newline_offsets
+
+# A ```dart fence, its body, and the closing ``` fence. Body lines may not be
+# fences themselves, so a nested ```dart restarts the block and an unclosed
+# block never matches.
+DART_BLOCK_RE = re.compile(
+    r'^[^\S\n]*```dart[^\S\n]*\n'
+    r'((?:(?![^\S\n]*```(?:dart)?[^\S\n]*$).*\n)*)'
+    r'[^\S\n]*```[^\S\n]*$',
+    re.MULTILINE,
+)
 
 
 def load_config(config_dir: Path) -> dict:
@@ -29,45 +41,56 @@ def load_config(config_dir: Path) -> dict:
     # Load documentation.json
     doc_file = config_dir / 'documentation.json'
     if doc_file.exists():
-        with open(doc_file) as f:
-            doc = json.load(f)
-            config['drift_patterns'] = doc.get('drift_patterns', [])
+        doc = load_json(doc_file)
+        # Copied: the loaded config is shared and compiled patterns are added below
+        config['drift_patterns'] = [dict(p) for p in doc.get('drift_patterns', [])]
+
+    for pattern_info in config['drift_patterns']:
+        pattern_info['_compiled'] = re.compile(pattern_info.get('pattern', ''))
+    config['drift_prefilter'] = combine_patterns(config['drift_patterns'])
 
     return config
 
 
+def combine_patterns(drift_patterns: list[dict]) -> Optional[re.Pattern]:
+    """Build a prefilter matching wherever any drift pattern does, or None if unsafe."""
+    compiled = [p['_compiled'] for p in drift_patterns]
+    if not compiled or any(c.groups for c in compiled):
+        return None
+    try:
+        return re.compile('|'.join(f'(?:{c.pattern})' for c in compiled))
+    except re.error:
+        return None
+
+
 def extract_dart_blocks(readme_path: Path) -> list[tuple[int, str]]:
     """Extract dart code blocks with their starting line numbers."""
     content = readme_path.read_text()
     blocks = []
-    in_dart = False
-    start_line = 0
-    current_block = []
-
-    for i, line in enumerate(content.split('\n'), 1):
-        if line.strip() == '```dart':
-            in_dart = True
-            start_line = i
-            current_block = []
-        elif line.strip() == '```' and in_dart:
-            in_dart = False
-            blocks.append((start_line, '\n'.join(current_block)))
-        elif in_dart:
-            current_block.append(line)
-
+    # Count newlines incrementally from the previous block so the README is
+    # scanned once overall rather than once per block
+    line, pos = 1, 0
+    for match in DART_BLOCK_RE.finditer(content):
+        line += content.count('\n', pos, match.start())
+        pos = match.start()
+        blocks.append((line, match.group(1)[:-1]))
     return blocks
 
 
 def check_block(line_num: int, code: str, config: dict) -> list[dict]:
     """Check a code block for drift patterns."""
+    prefilter = config.get('drift_prefilter')
+    if prefilter is not None and not prefilter.search(code):
+        return []
+
+    offsets = newline_offsets(code)
     issues = []
     for pattern_info in config['drift_patterns']:
-        pattern = pattern_info.get('pattern', '')
         message = pattern_info.get('message', 'Documentation drift detected')
         severity = pattern_info.get('severity', 'warning')
 
-        for match in re.finditer(pattern, code):
-            block_line = code[:match.start()].count('\n') + 1
+        for match in pattern_info['_compiled'].finditer(code):
+            block_line = line_number(offsets, match.start())
             issues.append({
                 'line': line_num + block_line,
                 'match': match.group(),
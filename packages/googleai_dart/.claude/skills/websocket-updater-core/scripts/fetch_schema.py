@@ -18,6 +18,24 @@ import json
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional accelerator; fall back to the stdlib
+    orjson = None
+
+
+def loads_json(data: bytes):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(path: Path, obj) -> None:
+    """Write obj as 2-space indented JSON, byte-identical to json.dump."""
+    with path.open('w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2)
+
 
 def load_config(config_dir: Path) -> dict:
     """Load configuration from config directory."""
@@ -30,16 +48,14 @@ def load_config(config_dir: Path) -> dict:
     # Load specs.json
     specs_file = config_dir / 'specs.json'
     if specs_file.exists():
-        with open(specs_file) as f:
-            specs = json.load(f)
-            config['specs'] = specs.get('specs', {})
-            config['output_dir'] = specs.get('output_dir', config['output_dir'])
+        specs = loads_json(specs_file.read_bytes())
+        config['specs'] = specs.get('specs', {})
+        config['output_dir'] = specs.get('output_dir', config['output_dir'])
 
     # Load schema.json (the actual schema definition)
     schema_file = config_dir / 'schema.json'
     if schema_file.exists():
-        with open(schema_file) as f:
-            config['schema'] = json.load(f)
+        config['schema'] = loads_json(schema_file.read_bytes())
 
     return config
 
@@ -94,7 +110,7 @@ def main():
 
     # Save to output
     output_file = args.output or (output_dir / f'latest-{args.spec}.json')
-    output_file.write_text(json.dumps(schema, indent=2))
+    write_json(output_file, schema)
 
     print(f"✓ Schema saved to {output_file}")
     print()